@@ -13,6 +13,11 @@ import time
 import requests
 import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add the root directory to path so we can import other modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from api.walrus_sdk_manager import WalrusSDKManager
@@ -51,6 +56,12 @@ def safe_console_print(text, prefix=""):
             # Optionally log the length
             print(f"{prefix}[Content length: {len(text)} characters]")
 
+def dumps_json(obj):
+    """Serialize obj to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         # Parse request body
@@ -58,14 +69,14 @@ class handler(BaseHTTPRequestHandler):
         post_data = self.rfile.read(content_length)
         
         try:
-            data = json.loads(post_data)
+            data = orjson.loads(post_data) if orjson is not None else json.loads(post_data)
             response_data = process_encrypt_and_upload(data)
             
             # Send response
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
+            self.wfile.write(dumps_json(response_data))
                 
         except json.JSONDecodeError:
             self.send_error(400, "Invalid JSON data")
@@ -75,9 +86,9 @@ class handler(BaseHTTPRequestHandler):
             self.end_headers()
             error_response = {
                 'error': str(e),
-                'traceback': str(sys.exc_info())
+                'traceback': traceback.format_exc()
             }
-            self.wfile.write(json.dumps(error_response).encode())
+            self.wfile.write(dumps_json(error_response))
     
     def do_GET(self):
         # Simple endpoint info for GET requests
@@ -91,7 +102,7 @@ class handler(BaseHTTPRequestHandler):
             'method': 'POST'
         }
         
-        self.wfile.write(json.dumps(response).encode())
+        self.wfile.write(dumps_json(response))
 
 def log_message(message, data=None, is_error=False):
     timestamp = datetime.datetime.now().isoformat()
@@ -175,7 +186,8 @@ def process_encrypt_and_upload(data: Dict[str, Any]) -> Dict[str, Any]:
         config = {
             "operation": "encrypt",
             "documentPath": temp_file_path,
-            "documentContentBase64": base64.b64encode(content_bytes).decode('utf-8'),
+            # Reuse the caller's base64 string rather than encoding the decoded bytes again
+            "documentContentBase64": document_content if is_base64 else base64.b64encode(content_bytes).decode('utf-8'),
             "contractId": contract_id,
             "signerAddresses": signer_addresses,
             "adminPrivateKey": ADMIN_PRIVATE_KEY,
@@ -3,33 +3,144 @@ import json
 import hashlib
 import os
 import sys
-import base64
-import tempfile
-import io
+import binascii
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import parse_qs
 import datetime,traceback
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pybase64 is a drop-in SIMD-accelerated decoder; fall back to the stdlib
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
 
 # Add the root directory to path so we can import the WalrusSDKManager
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from api.walrus_sdk_manager import WalrusSDKManager
 from api.encrypt_and_upload import process_encrypt_and_upload
 
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
+logger = logging.getLogger(__name__)
+
+# Base URL of the Next.js app whose API stores contract and user data
+APP_URL = os.environ.get('NEXT_PUBLIC_APP_URL', 'http://localhost:3000').rstrip('/')
+
+# Shared session for calls to the app API; keeps connections alive across requests
+# and retries transient gateway errors with backoff
+_retry = Retry(total=3, backoff_factor=0.1, status_forcelist=[502, 503, 504], allowed_methods=['GET', 'PATCH'])
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_retry)
+SESSION = requests.Session()
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# Shared pool for outbound API calls so a burst of uploads cannot open an
+# unbounded number of concurrent connections; sized to the adapter pool
+IO_POOL = ThreadPoolExecutor(max_workers=32)
+
+# (connect, read) timeout in seconds for calls made through SESSION
+REQUEST_TIMEOUT = (3, 30)
+
+# Number of base64 characters decoded and hashed per step (a multiple of 4)
+BASE64_CHUNK_SIZE = 64 * 1024
+
+# Largest request body accepted by the handler, in bytes
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 64 * 1024 * 1024))
+
+# Walrus managers are reused across requests, one per context
+_WALRUS_MANAGERS = {}
+_WALRUS_MANAGERS_LOCK = threading.Lock()
+
+# Email -> (wallet_address, expires_at) for recently resolved signers, oldest first
+_WALLET_CACHE = OrderedDict()
+_WALLET_CACHE_LOCK = threading.Lock()
+WALLET_CACHE_TTL = 300
+WALLET_CACHE_MAXSIZE = 1024
+
+def dumps_json(obj):
+    """Serialize obj to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+def loads_json(data):
+    """Parse JSON from bytes-like data, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def read_body(rfile, content_length):
+    """Read exactly content_length bytes from rfile into a single preallocated buffer"""
+    buffer = bytearray(content_length)
+    view = memoryview(buffer)
+    received = 0
+    while received < content_length:
+        count = rfile.readinto(view[received:])
+        if not count:
+            raise ValueError("Request body ended before Content-Length bytes were read")
+        received += count
+    return buffer
+
+def parse_binary_upload(query, content):
+    """Build upload request data for a raw binary body.
+    
+    The document bytes are the body itself; the remaining fields come from the
+    query string, e.g. ?contractId=...&context=testnet&epochs=2&deletable=true
+    """
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    data = {
+        'contractContent': content,
+        'isBase64': False,
+        'context': params.get('context', 'testnet'),
+        'epochs': int(params.get('epochs', 2)),
+    }
+    for flag in ('deletable', 'useSeal', 'preEncrypted'):
+        if flag in params:
+            data[flag] = params[flag].lower() in ('1', 'true', 'yes')
+    for field in ('contractId', 'documentIdHex', 'documentSalt', 'allowlistId', 'capId'):
+        if field in params:
+            data[field] = params[field]
+    return data
+
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         # Parse request body
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            self.send_error(400, "Invalid Content-Length")
+            return
+        if content_length > MAX_REQUEST_BYTES:
+            self.send_error(413, "Request body too large")
+            return
         
         try:
-            data = json.loads(post_data)
+            body = read_body(self.rfile, content_length)
+            # Raw binary bodies skip the base64 round-trip; JSON stays supported
+            if self.headers.get('Content-Type', '').startswith('application/octet-stream'):
+                data = parse_binary_upload(self.path.partition('?')[2], body)
+            else:
+                data = loads_json(body)
             response_data = process_upload(data)
             
             # Send response
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
+            self.wfile.write(dumps_json(response_data))
                 
         except json.JSONDecodeError:
             self.send_error(400, "Invalid JSON data")
@@ -39,9 +150,9 @@ class handler(BaseHTTPRequestHandler):
             self.end_headers()
             error_response = {
                 'error': str(e),
-                'traceback': str(sys.exc_info())
+                'traceback': traceback.format_exc()
             }
-            self.wfile.write(json.dumps(error_response).encode())
+            self.wfile.write(dumps_json(error_response))
     
     def do_GET(self):
         # Simple endpoint info for GET requests
@@ -55,63 +166,176 @@ class handler(BaseHTTPRequestHandler):
             'method': 'POST'
         }
         
-        self.wfile.write(json.dumps(response).encode())
+        self.wfile.write(dumps_json(response))
 
 def fetch_wallet_addresses(contract_id=None, signer_emails=None):
     """Fetch wallet addresses for the signers of a contract"""
-    print(f"Fetching wallet addresses for contract {contract_id}")
+    logger.info("Fetching wallet addresses for contract %s", contract_id)
     
     try:
         if contract_id:
             # Fetch contract details to get signer emails
-            app_url = os.environ.get('NEXT_PUBLIC_APP_URL', 'http://localhost:3000')
-            contract_url = f"{app_url}/api/contracts/{contract_id}"
-            print(f"Fetching contract details from {contract_url}")
+            contract_url = f"{APP_URL}/api/contracts/{contract_id}"
+            logger.info("Fetching contract details from %s", contract_url)
             
-            contract_response = requests.get(contract_url)
+            contract_response = SESSION.get(contract_url, timeout=REQUEST_TIMEOUT)
             if not contract_response.ok:
-                print(f"Error fetching contract: {contract_response.status_code}")
+                logger.error("Error fetching contract: %s", contract_response.status_code)
                 return []
             
             contract_data = contract_response.json()
             signer_emails = contract_data.get('metadata', {}).get('signers', [])
-            print(f"Found signer emails: {signer_emails}")
+            logger.info("Found signer emails: %s", signer_emails)
         
         if not signer_emails or len(signer_emails) == 0:
-            print("No signer emails found")
+            logger.info("No signer emails found")
             return []
             
-        # Fetch wallet addresses for each signer
-        wallet_addresses = []
-        app_url = os.environ.get('NEXT_PUBLIC_APP_URL', 'http://localhost:3000')
+        # Fetch wallet addresses for all signers concurrently
+        users_api_url = f"{APP_URL}/api/users"
+        
+        # Serve repeat lookups from the cache and only fetch the misses
+        now = time.monotonic()
+        cached = {}
+        with _WALLET_CACHE_LOCK:
+            for email in signer_emails:
+                entry = _WALLET_CACHE.get(email)
+                if entry and entry[1] > now:
+                    cached[email] = entry[0]
+        to_fetch = [email for email in dict.fromkeys(signer_emails) if email not in cached]
+        if cached:
+            logger.info("Using cached wallet addresses for %s signers", len(cached))
         
-        for email in signer_emails:
-            user_url = f"{app_url}/api/users?email={email}"
-            print(f"Fetching user details for {email} from {user_url}")
+        def fetch_wallet_address(email):
+            user_url = f"{users_api_url}?email={email}"
+            logger.info("Fetching user details for %s from %s", email, user_url)
             
-            user_response = requests.get(user_url)
+            user_response = SESSION.get(user_url, timeout=REQUEST_TIMEOUT)
             if not user_response.ok:
-                print(f"Error fetching user {email}: {user_response.status_code}")
-                continue
+                logger.error("Error fetching user %s: %s", email, user_response.status_code)
+                return None
             
             user_data = user_response.json()
             wallet_address = user_data.get('walletAddress')
             
             if wallet_address:
-                print(f"Found wallet address for {email}: {wallet_address}")
-                wallet_addresses.append(wallet_address)
+                logger.info("Found wallet address for %s: %s", email, wallet_address)
             else:
-                print(f"No wallet address found for {email}")
+                logger.info("No wallet address found for %s", email)
+            return wallet_address
+        
+        if to_fetch:
+            fetched = dict(zip(to_fetch, IO_POOL.map(fetch_wallet_address, to_fetch)))
+            
+            now = time.monotonic()
+            expires_at = now + WALLET_CACHE_TTL
+            with _WALLET_CACHE_LOCK:
+                for email, address in fetched.items():
+                    if address:
+                        _WALLET_CACHE[email] = (address, expires_at)
+                        _WALLET_CACHE.move_to_end(email)
+                # Entries share one TTL, so the oldest are also the first to expire:
+                # drop expired ones, then the oldest until the cache fits
+                while _WALLET_CACHE:
+                    email, (_, entry_expires_at) = next(iter(_WALLET_CACHE.items()))
+                    if entry_expires_at > now and len(_WALLET_CACHE) <= WALLET_CACHE_MAXSIZE:
+                        break
+                    _WALLET_CACHE.popitem(last=False)
+            cached.update(fetched)
+        
+        wallet_addresses = [cached[email] for email in signer_emails if cached.get(email)]
         
-        print(f"Returning {len(wallet_addresses)} wallet addresses")
+        logger.info("Returning %s wallet addresses", len(wallet_addresses))
         return wallet_addresses
     except Exception as e:
-        print(f"Error fetching wallet addresses: {str(e)}")
+        logger.error("Error fetching wallet addresses: %s", e)
         return []
 
+def get_walrus_manager(context):
+    """Return the shared WalrusSDKManager for a context, creating it on first use"""
+    with _WALRUS_MANAGERS_LOCK:
+        manager = _WALRUS_MANAGERS.get(context)
+        if manager is None:
+            manager = WalrusSDKManager(context=context, verbose=False)
+            _WALRUS_MANAGERS[context] = manager
+        return manager
+
+def update_contract_metadata(contract_api_url, walrus_metadata, column_updates):
+    """Store the Walrus metadata and contract columns with a single PATCH.
+    
+    The contracts API merges 'metadata' into the stored metadata itself, so
+    only the 'walrus' entry is sent and no GET of the existing contract is
+    needed. Returns True if the update succeeded.
+    """
+    update = {
+        'metadata': {'walrus': walrus_metadata},
+        'content': None,
+        **column_updates
+    }
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sending combined update: %s", json.dumps(update, indent=2))
+    try:
+        update_response = SESSION.patch(contract_api_url, json=update, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        logger.error("Error updating contract metadata via API: %s", e)
+        return False
+    
+    logger.info("Combined update status code: %s", update_response.status_code)
+    if not update_response.ok:
+        logger.error("Failed to update contract via API: %s", update_response.status_code)
+        logger.error("Error: %s", update_response.text)
+        return False
+    return True
+
+def decode_contract_content(contract_content, is_base64, compute_hash=True):
+    """Decode the contract content to bytes and hash it in the same pass.
+    
+    Returns a (content_bytes, sha256_hexdigest) tuple; the digest is None
+    when compute_hash is False.
+    """
+    digest = hashlib.sha256() if compute_hash else None
+    
+    if not is_base64:
+        # Convert string to bytes if not already
+        if isinstance(contract_content, str):
+            contract_content = contract_content.encode('utf-8')
+        if digest is None:
+            return contract_content, None
+        digest.update(contract_content)
+        return contract_content, digest.hexdigest()
+    
+    # Padding is only valid at the very end; each slice is validated on its own
+    if '=' in contract_content[:-2]:
+        raise ValueError("Invalid base64 content: padding before end of data")
+    
+    if len(contract_content) % 4:
+        raise ValueError("Invalid base64 content: length is not a multiple of 4")
+    
+    # Decode each slice straight into a buffer of the exact decoded size
+    decoded_size = len(contract_content) // 4 * 3 - contract_content[-2:].count('=')
+    content_bytes = bytearray(decoded_size)
+    offset = 0
+    try:
+        for start in range(0, len(contract_content), BASE64_CHUNK_SIZE):
+            chunk = b64decode(contract_content[start:start + BASE64_CHUNK_SIZE], validate=True)
+            if digest is not None:
+                digest.update(chunk)
+            content_bytes[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64 content: {e}") from e
+    
+    return content_bytes, digest.hexdigest() if digest is not None else None
+
 def process_upload(data):
-    """Process the upload request data and return response"""
-    print("Processing upload request", data.get('contractId'))
+    """Process the upload request data and return response
+    
+    Pre-encrypted uploads carry ciphertext, so the server does not hash it.
+    Clients that want a document hash in the response must send the
+    plaintext digest as 'plaintextHashSha256'; otherwise 'hash' is None.
+    """
+    logger.info("Processing upload request %s", data.get('contractId'))
     
     # Check if required fields are present
     if 'contractId' not in data or 'contractContent' not in data:
@@ -120,6 +344,11 @@ def process_upload(data):
     # Extract contract data
     contract_id = data['contractId']
     contract_content = data['contractContent']
+    # Accept data URIs (data:application/pdf;base64,...) by dropping the header
+    if data.get('isBase64', False) and isinstance(contract_content, str) and contract_content.startswith('data:'):
+        contract_content = contract_content[contract_content.find(',') + 1:]
+        data['contractContent'] = contract_content
+    contract_api_url = f"{APP_URL}/api/contracts/{contract_id}"
     
     # NEW FLAG: Check if document is pre-encrypted by client
     pre_encrypted = data.get('preEncrypted', False)
@@ -131,28 +360,21 @@ def process_upload(data):
     client_cap_id = data.get('capId')
     
     if pre_encrypted:
-        print(f"Document is pre-encrypted by client with ID: {document_id_hex}")
+        logger.info("Document is pre-encrypted by client with ID: %s", document_id_hex)
         if client_allowlist_id:
-            print(f"Using client-provided allowlist ID: {client_allowlist_id}")
+            logger.info("Using client-provided allowlist ID: %s", client_allowlist_id)
             if client_cap_id:
-                print(f"Using client-provided capability ID: {client_cap_id}")
+                logger.info("Using client-provided capability ID: %s", client_cap_id)
             else:
-                print("WARNING: Client provided allowlist ID but no capability ID!")
-    
-    # Decode the content if it's base64 encoded
-    if data.get('isBase64', False):
-        try:
-            contract_content = base64.b64decode(contract_content)
-        except:
-            raise ValueError("Invalid base64 content")
-    else:
-        # Convert string to bytes if not already
-        if isinstance(contract_content, str):
-            contract_content = contract_content.encode('utf-8')
+                logger.warning("Client provided allowlist ID but no capability ID!")
     
-    # Hash the document
-    hash_sha256 = hashlib.sha256(contract_content).hexdigest()
-    print(f"Document hash (SHA-256): {hash_sha256}")
+    # Decode the content if it's base64 encoded and hash the document.
+    # Hashing ciphertext is meaningless, so pre-encrypted uploads use the client's plaintext hash.
+    contract_content, hash_sha256 = decode_contract_content(
+        contract_content, data.get('isBase64', False), compute_hash=not pre_encrypted)
+    if pre_encrypted:
+        hash_sha256 = data.get('plaintextHashSha256')
+    logger.info("Document hash (SHA-256): %s", hash_sha256)
     
     # Check if the request is for SEAL encryption
     use_seal = data.get('useSeal', True)
@@ -160,26 +382,27 @@ def process_upload(data):
     
     # If SEAL is enabled but no signer addresses are provided, fetch them from the database
     if use_seal and not signer_addresses:
-        print("No signer addresses provided, fetching from database")
+        logger.info("No signer addresses provided, fetching from database")
         # If metadata.signers is provided in the data, use it to fetch wallet addresses
         signer_emails = data.get('metadata', {}).get('signers', [])
         if signer_emails:
-            print(f"Using provided signer emails: {signer_emails}")
+            logger.info("Using provided signer emails: %s", signer_emails)
             signer_addresses = fetch_wallet_addresses(signer_emails=signer_emails)
         else:
             # Otherwise, try to fetch from existing contract
-            print(f"Fetching signers for contract: {contract_id}")
+            logger.info("Fetching signers for contract: %s", contract_id)
             signer_addresses = fetch_wallet_addresses(contract_id=contract_id)
     
     try:
         if use_seal and signer_addresses:
-            print(f"Using SEAL encryption for document with {len(signer_addresses)} signer addresses")
+            logger.info("Using SEAL encryption for document with %s signer addresses", len(signer_addresses))
             
             # Prepare data for SEAL encryption
             seal_data = {
                 'contractId': contract_id,
-                'documentContent': base64.b64encode(contract_content).decode('utf-8') if isinstance(contract_content, bytes) else contract_content,
-                'isBase64': True if isinstance(contract_content, bytes) else False,
+                # Pass the content through as the client sent it instead of re-encoding the decoded bytes
+                'documentContent': data['contractContent'],
+                'isBase64': data.get('isBase64', False),
                 'signerAddresses': signer_addresses,
                 # Pass pre-encrypted flag and document ID
                 'preEncrypted': pre_encrypted,
@@ -192,17 +415,18 @@ def process_upload(data):
             
             # Process SEAL encryption and upload
             try:
-                print("Attempting SEAL encryption and upload...")
+                logger.info("Attempting SEAL encryption and upload...")
                 seal_response = process_encrypt_and_upload(seal_data)
                 
                 if seal_response.get('encrypted', True):
-                    print("SEAL encryption and upload successful")
-                    print(f"SEAL response data: {json.dumps(seal_response, indent=2)}")
+                    logger.info("SEAL encryption and upload successful")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("SEAL response data: %s", dumps_json(seal_response).decode())
                     
                     # Add the hash and contract ID to the response
                     seal_response['contractId'] = contract_id
                     seal_response['hash'] = hash_sha256
-                    print(f"Added contract ID {contract_id} and hash {hash_sha256} to response")
+                    logger.info("Added contract ID %s and hash %s to response", contract_id, hash_sha256)
                     
                     # Prepare walrus data
                     walrus_data = {
@@ -214,204 +438,103 @@ def process_upload(data):
                         'authorizedWallets': signer_addresses if signer_addresses else [],
                         'uploadedAt': datetime.datetime.now().isoformat()
                     }
-                    print(f"Prepared Walrus data: {json.dumps(walrus_data, indent=2)}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Prepared Walrus data: %s", json.dumps(walrus_data, indent=2))
                     
                     # Add walrus data to the response
                     seal_response['walrusData'] = walrus_data
-                    print("Added Walrus data to SEAL response")
+                    logger.info("Added Walrus data to SEAL response")
                     
                     # Update the database using the API endpoint
-                    try:
-                        # Get the app URL from environment or use localhost
-                        app_url = os.environ.get('NEXT_PUBLIC_APP_URL', 'http://localhost:3000')
-                        api_url = f"{app_url}/api/contracts/{contract_id}"
-                        
-                        print(f"Updating contract metadata via API: {api_url}")
-                        
-                        # First, get the existing contract metadata
-                        try:
-                            get_response = requests.get(api_url)
-                            if get_response.status_code == 200:
-                                existing_contract = get_response.json()
-                                existing_metadata = existing_contract.get('metadata', {}) or {}
-                                print(f"Got existing metadata: {json.dumps(existing_metadata, indent=2)}")
-                                
-                                # First, only send metadata update
-                                metadata_only_update = {
-                                    'metadata': {
-                                        'walrus': {
-                                            'storage': {
-                                                'blobId': walrus_data['blobId'],
-                                                'uploadedAt': walrus_data['uploadedAt'],
-                                                'uploadType': 'seal' if walrus_data.get('encryptionMethod') == 'seal' else 'standard'
-                                            },
-                                            'encryption': {
-                                                'method': walrus_data.get('encryptionMethod', 'standard'),
-                                                'allowlistId': walrus_data.get('allowlistId'),
-                                                'documentId': walrus_data.get('documentId'),
-                                                'capId': walrus_data.get('capId')
-                                            },
-                                            'authorizedWallets': walrus_data.get('authorizedWallets', []),
-                                            'lastUpdated': datetime.datetime.now().isoformat()
-                                        }
-                                    }
-                                }
-                                
-                                print(f"Sending metadata-only update: {json.dumps(metadata_only_update, indent=2)}")
-                                metadata_response = requests.patch(
-                                    api_url,
-                                    json=metadata_only_update,
-                                    headers={'Content-Type': 'application/json'}
-                                )
-                                
-                                # Check if metadata update was successful
-                                if metadata_response.status_code == 200:
-                                    print(f"Successfully updated metadata. Now trying to update specific columns...")
-                                    
-                                    # Now try individual field updates
-                                    field_updates = []
-                                    
-                                    # Try to update walrusBlobId separately
-                                    if walrus_data['blobId']:
-                                        try:
-                                            blob_update = {'walrusBlobId': walrus_data['blobId']}
-                                            blob_response = requests.patch(api_url, json=blob_update)
-                                            field_updates.append(f"walrusBlobId: {blob_response.status_code}")
-                                        except Exception as e:
-                                            print(f"Error updating walrusBlobId field: {str(e)}")
-                                    
-                                    # Try to update allowlistId separately
-                                    if walrus_data.get('allowlistId'):
-                                        try:
-                                            allowlist_update = {'allowlistId': walrus_data.get('allowlistId')}
-                                            allowlist_response = requests.patch(api_url, json=allowlist_update)
-                                            field_updates.append(f"allowlistId: {allowlist_response.status_code}")
-                                        except Exception as e:
-                                            print(f"Error updating allowlistId field: {str(e)}")
-                                    
-                                    # Try to update documentId separately
-                                    if walrus_data.get('documentId'):
-                                        try:
-                                            doc_update = {'documentId': walrus_data.get('documentId')}
-                                            doc_response = requests.patch(api_url, json=doc_update)
-                                            field_updates.append(f"documentId: {doc_response.status_code}")
-                                        except Exception as e:
-                                            print(f"Error updating documentId field: {str(e)}")
-                                    
-                                    # Try to update authorizedUsers separately
-                                    if walrus_data.get('authorizedWallets'):
-                                        try:
-                                            auth_update = {'authorizedUsers': walrus_data.get('authorizedWallets', [])}
-                                            auth_response = requests.patch(api_url, json=auth_update)
-                                            field_updates.append(f"authorizedUsers: {auth_response.status_code}")
-                                        except Exception as e:
-                                            print(f"Error updating authorizedUsers field: {str(e)}")
-                                    
-                                    # Add content update to null
-                                    try:
-                                        content_update = {'content': None}
-                                        content_response = requests.patch(api_url, json=content_update)
-                                        field_updates.append(f"content: {content_response.status_code}")
-                                    except Exception as e:
-                                        print(f"Error updating content field: {str(e)}")
-                                    
-                                    print(f"Individual field update results: {', '.join(field_updates)}")
-                                    seal_response['databaseUpdated'] = True
-                                else:
-                                    print(f"Failed to update contract metadata via API: {metadata_response.status_code}")
-                                    print(f"Error: {metadata_response.text}")
-                                    seal_response['databaseUpdated'] = False
-                            else:
-                                print(f"Failed to get existing contract: {get_response.status_code}")
-                                seal_response['databaseUpdated'] = False
-                        except Exception as e:
-                            print(f"Error getting existing contract: {str(e)}")
-                            seal_response['databaseUpdated'] = False
-                            
-                    except Exception as e:
-                        print(f"Error updating contract metadata via API: {str(e)}")
-                        print(f"Full error details: {str(sys.exc_info())}")
-                        seal_response['databaseUpdated'] = False
+                    logger.info("Updating contract metadata via API: %s", contract_api_url)
+                    walrus_metadata = {
+                        'storage': {
+                            'blobId': walrus_data['blobId'],
+                            'uploadedAt': walrus_data['uploadedAt'],
+                            'uploadType': 'seal' if walrus_data.get('encryptionMethod') == 'seal' else 'standard'
+                        },
+                        'encryption': {
+                            'method': walrus_data.get('encryptionMethod', 'standard'),
+                            'allowlistId': walrus_data.get('allowlistId'),
+                            'documentId': walrus_data.get('documentId'),
+                            'capId': walrus_data.get('capId')
+                        },
+                        'authorizedWallets': walrus_data.get('authorizedWallets', []),
+                        'lastUpdated': datetime.datetime.now().isoformat()
+                    }
                     
-                    print("Returning SEAL response with all data")
+                    # Only set the columns that have a value
+                    column_updates = {
+                        'walrusBlobId': walrus_data['blobId'],
+                        'allowlistId': walrus_data.get('allowlistId'),
+                        'documentId': walrus_data.get('documentId'),
+                        'authorizedUsers': walrus_data.get('authorizedWallets'),
+                    }
+                    seal_response['databaseUpdated'] = update_contract_metadata(
+                        contract_api_url,
+                        walrus_metadata,
+                        {field: value for field, value in column_updates.items() if value}
+                    )
+                    
+                    logger.info("Returning SEAL response with all data")
                     return seal_response
                 else:
-                    print("SEAL encryption failed, falling back to standard upload")
-                    print(f"SEAL response: {json.dumps(seal_response, indent=2)}")
+                    logger.warning("SEAL encryption failed, falling back to standard upload")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("SEAL response: %s", dumps_json(seal_response).decode())
                     # Continue with standard upload
                     return seal_response
             except Exception as e:
-                print(f"SEAL encryption error: {str(e)}")
-                traceback.print_exc()
+                logger.exception("SEAL encryption error: %s", e)
                 # Continue with standard upload
         else:
             if use_seal:
-                print("SEAL encryption enabled but no signer addresses available, using standard upload")
+                logger.info("SEAL encryption enabled but no signer addresses available, using standard upload")
             else:
-                print("SEAL encryption not requested, using standard upload")
+                logger.info("SEAL encryption not requested, using standard upload")
         
-        # Create a temporary file only if the SDK requires a file path
         # Initialize Walrus SDK Manager
         context = data.get('context', 'testnet')
-        walrus_manager = WalrusSDKManager(context=context, verbose=True)
+        walrus_manager = get_walrus_manager(context)
         
         # Upload to Walrus
         epochs = data.get('epochs', 2)
         deletable = data.get('deletable', False)
         
         try:
-            # Use the Walrus client directly to get the full raw response
-            # Get the client instance from the manager
-            client = walrus_manager.client
+            logger.info("Uploading document to Walrus using in-memory approach")
             
-            print(f"Uploading document to Walrus using in-memory approach")
+            # Upload the bytes directly; no temporary file is needed
+            raw_response = walrus_manager.put_blob_from_bytes(
+                contract_content,
+                epochs=epochs,
+                deletable=deletable
+            )
             
-            # Use a BytesIO object to avoid temporary file creation
-            # However, since the SDK expects a file path, we temporarily create a file
-            temp_dir = tempfile.gettempdir()
-            temp_file_path = os.path.join(temp_dir, f"{contract_id}.pdf")
-            
-            try:
-                # Create temporary file only for the SDK call
-                with open(temp_file_path, 'wb') as f:
-                    f.write(contract_content)
-                
-                # Upload document
-                raw_response = client.put_blob_from_file(
-                    str(temp_file_path),
-                    epochs=epochs,
-                    deletable=deletable
-                )
-            finally:
-                # Always clean up temporary file
-                if os.path.exists(temp_file_path):
-                    os.remove(temp_file_path)
-            
-            print("Upload successful")
+            logger.info("Upload successful")
             
             # Log the response details
-            print("Walrus response details:")
+            logger.info("Walrus response details:")
             try:
                 response_type = "alreadyCertified" if "alreadyCertified" in raw_response else "newlyCreated"
                 if response_type == "alreadyCertified":
                     blob_id = raw_response["alreadyCertified"].get("blobId")
-                    print(f"  Blob already certified with ID: {blob_id}")
+                    logger.info("  Blob already certified with ID: %s", blob_id)
                 else:
                     blob_object = raw_response.get("newlyCreated", {}).get("blobObject", {})
                     blob_id = blob_object.get("blobId")
-                    print(f"  New blob created with ID: {blob_id}")
-                    print(f"  Size: {blob_object.get('size')} bytes")
-                    print(f"  Created at: {blob_object.get('creationTime')}")
+                    logger.info("  New blob created with ID: %s", blob_id)
+                    logger.info("  Size: %s bytes", blob_object.get('size'))
+                    logger.info("  Created at: %s", blob_object.get('creationTime'))
             except Exception as e:
-                print(f"  Error parsing response details: {e}")
-                print(f"  Raw response: {raw_response}")
+                logger.error("  Error parsing response details: %s", e)
+                logger.info("  Raw response: %s", raw_response)
             
             # Prepare response with the raw Walrus response and hash
             response_data = {
                 'contractId': contract_id,
                 'hash': hash_sha256,
-                'walrusResponse': raw_response,
-                'raw': str(raw_response)
+                'walrusResponse': raw_response
             }
             
             # Extract the blob ID for standard upload
@@ -436,97 +559,43 @@ def process_upload(data):
                 }
                 
                 # Update the contract via API
-                try:
-                    # Get the app URL from environment or use localhost
-                    app_url = os.environ.get('NEXT_PUBLIC_APP_URL', 'http://localhost:3000')
-                    api_url = f"{app_url}/api/contracts/{contract_id}"
-                    
-                    print(f"Updating contract metadata via API for standard upload: {api_url}")
-                    
-                    # Get existing metadata first
-                    try:
-                        get_response = requests.get(api_url)
-                        existing_metadata = {}
-                        if get_response.status_code == 200:
-                            existing_contract = get_response.json()
-                            existing_metadata = existing_contract.get('metadata', {}) or {}
-                    except Exception as e:
-                        print(f"Error fetching existing metadata: {str(e)}")
-                        existing_metadata = {}
-                    
-                    # Update the standard upload part too
-                    # First, only send metadata update
-                    metadata_only_update = {
-                        'metadata': {
-                            **existing_metadata,
-                            'walrus': {
-                                'storage': {
-                                    'blobId': blob_id,
-                                    'uploadedAt': datetime.datetime.now().isoformat(),
-                                    'uploadType': 'standard'
-                                },
-                                'authorizedWallets': signer_addresses,
-                                'lastUpdated': datetime.datetime.now().isoformat()
-                            }
-                        }
-                    }
-                    
-                    print(f"Sending metadata-only update: {json.dumps(metadata_only_update, indent=2)}")
-                    metadata_response = requests.patch(
-                        api_url,
-                        json=metadata_only_update,
-                        headers={'Content-Type': 'application/json'}
-                    )
-                    
-                    # Check if metadata update was successful
-                    if metadata_response.status_code == 200:
-                        print(f"Successfully updated metadata. Now updating all fields in one call...")
-                        
-                        try:
-                            # Combine all updates into one call
-                            combined_update = {
-                                'walrusBlobId': blob_id,
-                                'content': None,
-                                'authorizedUsers': signer_addresses
-                            }
-                            
-                            update_response = requests.patch(api_url, json=combined_update)
-                            print(f"Combined update status code: {update_response.status_code}")
-                            
-                            response_data['databaseUpdated'] = update_response.status_code == 200
-                        except Exception as e:
-                            print(f"Error making combined update: {str(e)}")
-                            response_data['databaseUpdated'] = False
-                    else:
-                        print(f"Failed to update contract metadata via API: {metadata_response.status_code}")
-                        print(f"Error: {metadata_response.text}")
-                        response_data['databaseUpdated'] = False
-                    
-                    # Add walrus data to the response
-                    response_data['walrusData'] = walrus_data
-                    
-                    print(f"Returning response with updates completed")
-                    return response_data
-                except Exception as e:
-                    print(f"Error updating contract metadata via API for standard upload: {str(e)}")
-                    response_data['databaseUpdated'] = False
+                logger.info("Updating contract metadata via API for standard upload: %s", contract_api_url)
+                walrus_metadata = {
+                    'storage': {
+                        'blobId': blob_id,
+                        'uploadedAt': walrus_data['uploadedAt'],
+                        'uploadType': 'standard'
+                    },
+                    'authorizedWallets': signer_addresses,
+                    'lastUpdated': datetime.datetime.now().isoformat()
+                }
+                response_data['databaseUpdated'] = update_contract_metadata(
+                    contract_api_url,
+                    walrus_metadata,
+                    {'walrusBlobId': blob_id, 'authorizedUsers': signer_addresses}
+                )
+                
+                # Add walrus data to the response
+                response_data['walrusData'] = walrus_data
+                
+                logger.info("Returning response with updates completed")
+                return response_data
             
-            print(f"Returning response with hash {hash_sha256} and blob ID {blob_id if 'blob_id' in locals() else 'unknown'}")
+            logger.info("Returning response with hash %s and blob ID %s", hash_sha256, blob_id if 'blob_id' in locals() else 'unknown')
             return response_data
             
         except Exception as e:
-            print(f"Error during upload: {str(e)}")
+            logger.error("Error during upload: %s", e)
             raise
         
     except Exception as e:
-        print(f"Error during upload process: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error during upload process: %s", e)
         raise
 
 # New function to handle pre-encrypted data
 def process_pre_encrypted_data(data, contract_id, encrypted_content, hash_sha256):
     """Process pre-encrypted data from the client"""
-    print("[ClientEncryption] Processing pre-encrypted data")
+    logger.info("[ClientEncryption] Processing pre-encrypted data")
     
     # Extract metadata from the request
     walrus_metadata = data.get('metadata', {}).get('walrus', {})
@@ -554,12 +623,12 @@ def process_pre_encrypted_data(data, contract_id, encrypted_content, hash_sha256
 
 # Support for direct execution from command line
 if __name__ == "__main__":
-    print("Starting")
+    logger.info("Starting")
     if len(sys.argv) >= 2:
         # Command-line execution mode (for development)
         request_file = sys.argv[1]
         
-        print(f"Reading request from {request_file}")
+        logger.info("Reading request from %s", request_file)
         with open(request_file, 'r') as f:
             request_data = json.load(f)
         
@@ -569,22 +638,22 @@ if __name__ == "__main__":
             
             # Print the response as JSON to stdout
             print("RESPONSE_JSON_BEGIN")
-            print(json.dumps(response_data))
+            print(dumps_json(response_data).decode())
             print("RESPONSE_JSON_END")
             
-            print("Upload completed successfully")
+            logger.info("Upload completed successfully")
             sys.exit(0)
         except Exception as e:
             error_response = {
                 'error': str(e),
-                'traceback': str(sys.exc_info())
+                'traceback': traceback.format_exc()
             }
             
-            print(f"Error: {str(e)}")
+            logger.error("Error: %s", e)
             
             # Print error response as JSON to stdout
             print("ERROR_JSON_BEGIN")
-            print(json.dumps(error_response))
+            print(dumps_json(error_response).decode())
             print("ERROR_JSON_END")
             
             sys.exit(1) 
\ No newline at end of file
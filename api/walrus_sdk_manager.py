@@ -24,18 +24,144 @@ import json
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Union, Optional, Any, BinaryIO
-import base64
+from typing import Dict, Iterator, List, Union, Optional, Any, BinaryIO
 import hashlib
+import io
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import shutil
 import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 try:
-    from walrus import WalrusClient, WalrusAPIError
+    import orjson
 except ImportError:
-    print("Error: walrus-python SDK is not installed.")
-    print("Please install it using: pip install walrus-python")
-    sys.exit(1)
+    orjson = None
+
+# walrus-python is imported on first WalrusSDKManager construction (see _load_walrus_sdk)
+WalrusClient = None
+WalrusAPIError = None
+
+logger = logging.getLogger(__name__)
+
+# Shared session for direct publisher uploads so warm invocations reuse the TLS connection.
+# Idempotent reads are retried with backoff on transient errors; PUT/POST bodies are
+# streamed from files and generators, which cannot be replayed, so those are not retried
+_retry = Retry(total=5, backoff_factor=0.25, status_forcelist=[429, 500, 502, 503, 504],
+               allowed_methods=['GET', 'HEAD', 'DELETE'], respect_retry_after_header=True)
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=_retry)
+SESSION = requests.Session()
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+
+class WalrusManagerError(Exception):
+    """Base class for errors raised by WalrusSDKManager."""
+
+
+class InitError(WalrusManagerError):
+    """The manager could not be configured or the Walrus client could not be created."""
+
+
+class UploadError(WalrusManagerError):
+    """A document could not be stored on Walrus."""
+
+
+class DownloadError(WalrusManagerError):
+    """A blob could not be read back from Walrus."""
+
+
+def _load_walrus_sdk() -> None:
+    """Import the walrus-python SDK into module globals, so the CLI and importers skip it until needed."""
+    global WalrusClient, WalrusAPIError
+    if WalrusClient is not None:
+        return
+    try:
+        from walrus import WalrusClient as client_class, WalrusAPIError as error_class
+    except ImportError as e:
+        raise InitError("walrus-python SDK is not installed. "
+                        "Please install it using: pip install walrus-python") from e
+    WalrusAPIError = error_class
+    WalrusClient = client_class
+
+
+# Block size for streaming file uploads and downloads
+STREAM_CHUNK_SIZE = 1 << 20
+
+# (connect, read) timeout in seconds for publisher uploads; the read timeout
+# covers the publisher encoding and certifying the blob before it answers
+UPLOAD_TIMEOUT = (5, 300)
+
+# Publisher statuses meaning the streamed PUT endpoint is not available
+_STREAM_UNSUPPORTED_STATUSES = (405, 501)
+
+# Number of blob metadata responses kept per manager
+METADATA_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=1024)
+def _ensure_dir(path: str) -> None:
+    """Create path (and parents) once per process; repeat calls for the same directory are free."""
+    Path(path).mkdir(parents=True, exist_ok=True)
+
+
+def _advise_sequential(file: BinaryIO) -> None:
+    """Hint the kernel that file will be read or written front to back (no-op where unsupported)."""
+    fadvise = getattr(os, "posix_fadvise", None)
+    if fadvise is None:
+        return
+    try:
+        fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except OSError:
+        pass
+
+
+def _iter_hashed_chunks(stream: BinaryIO, digest: Optional[Any], chunk_size: int = 64 * 1024):
+    """Yield chunks read from stream, feeding each one to digest (if given) as it is sent."""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if digest is not None:
+            digest.update(chunk)
+        yield chunk
+
+
+def _stream_put_unsupported(error: requests.RequestException, stream: BinaryIO) -> bool:
+    """
+    Whether a failed streamed PUT may be retried through the SDK.
+    
+    Only a publisher that does not accept the streamed PUT, or a connection that
+    failed before any of the body was read from stream, qualifies; anything else
+    (rejections, server errors, timeouts, mid-stream resets) is a real failure.
+    """
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in _STREAM_UNSUPPORTED_STATUSES
+    if isinstance(error, requests.ConnectionError):
+        try:
+            return stream.tell() == 0
+        except (OSError, ValueError):
+            return False
+    return False
+
+
+class _SizedBody:
+    """Iterable request body of known length, so requests sends Content-Length instead of chunking."""
+    
+    def __init__(self, chunks, length: int):
+        self.chunks = chunks
+        self.length = length
+    
+    def __len__(self) -> int:
+        return self.length
+    
+    def __iter__(self):
+        return iter(self.chunks)
 
 
 class WalrusSDKManager:
@@ -45,10 +171,13 @@ class WalrusSDKManager:
         
         Args:
             context: Walrus context to use (testnet or mainnet)
-            verbose: Whether to print detailed output
+            verbose: Whether to log the raw API responses
         """
         self.verbose = verbose
         self.context = context
+        # Certified blob metadata does not change, so lookups are cached (LRU)
+        self._metadata_cache = OrderedDict()
+        self._metadata_lock = threading.Lock()
         
         # Set appropriate endpoints based on context
         if context == "testnet":
@@ -58,19 +187,18 @@ class WalrusSDKManager:
             self.publisher_url = "https://publisher.walrus-mainnet.walrus.space"
             self.aggregator_url = "https://aggregator.walrus-mainnet.walrus.space"
         else:
-            print(f"Error: Unknown context '{context}'. Please use 'testnet' or 'mainnet'.")
-            sys.exit(1)
+            raise InitError(f"Unknown context '{context}'. Please use 'testnet' or 'mainnet'.")
         
         # Initialize the Walrus client
+        _load_walrus_sdk()
         try:
             self.client = WalrusClient(
                 publisher_base_url=self.publisher_url,
                 aggregator_base_url=self.aggregator_url
             )
-            print(f"Walrus SDK initialized for {context}")
+            logger.info("Walrus SDK initialized for %s", context)
         except Exception as e:
-            print(f"Error initializing Walrus client: {e}")
-            sys.exit(1)
+            raise InitError(f"Error initializing Walrus client: {e}") from e
     
     def upload_document(self, file_path: Union[str, Path], metadata: Optional[Dict[str, str]] = None, 
                        epochs: int = 2, deletable: bool = False) -> str:
@@ -85,24 +213,36 @@ class WalrusSDKManager:
             
         Returns:
             The blob ID of the uploaded document
+            
+        Raises:
+            UploadError: If the publisher or the SDK rejects the upload
         """
         file_path = Path(file_path)
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
         
-        print(f"Uploading {file_path}...")
+        logger.info("Uploading %s...", file_path)
         try:
-            response = self.client.put_blob_from_file(
-                str(file_path),
-                epochs=epochs,
-                deletable=deletable,
-                # Metadata is not directly supported by the SDK's put_blob methods,
-                # but we're keeping the parameter for API consistency
-            )
+            # Stream the file to the publisher so it is never held in memory;
+            # fall back to the SDK only if the streamed PUT is unavailable
+            # (metadata is not supported by the publisher API either way)
+            response = None
+            with open(file_path, "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                _advise_sequential(file)
+                try:
+                    response = self._put_blob_stream(file, size, epochs, deletable)
+                except requests.RequestException as e:
+                    if not _stream_put_unsupported(e, file):
+                        raise UploadError(f"API Error uploading document: {e}") from e
+                    logger.warning("Streaming upload unavailable (%s), retrying through the SDK", e)
+            if response is None:
+                response = self.client.put_blob_from_file(
+                    str(file_path),
+                    epochs=epochs,
+                    deletable=deletable,
+                )
             
             if self.verbose:
-                print("API Response:")
-                print(response)
+                logger.info("API Response: %s", response)
             
             # Extract blob ID from the nested response structure
             blob_id = None
@@ -112,23 +252,78 @@ class WalrusSDKManager:
                 blob_id = response['newlyCreated']['blobObject'].get('blobId')
             
             if not blob_id:
-                print(f"Error: Could not extract blob ID from response: {response}")
-                sys.exit(1)
+                raise UploadError(f"Could not extract blob ID from response: {response}")
                 
-            print(f"Document uploaded successfully! Blob ID: {blob_id}")
+            logger.info("Document uploaded successfully! Blob ID: %s", blob_id)
             if deletable:
-                print("Note: This blob is deletable and can be removed before expiry.")
+                logger.info("Note: This blob is deletable and can be removed before expiry.")
             else:
-                print("Note: This blob is permanent and cannot be deleted before expiry.")
+                logger.info("Note: This blob is permanent and cannot be deleted before expiry.")
             
             return blob_id
         
+        except UploadError:
+            raise
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"File not found: {file_path}") from e
         except WalrusAPIError as e:
-            print(f"API Error uploading document: {e}")
-            sys.exit(1)
+            raise UploadError(f"API Error uploading document: {e}") from e
+        except Exception as e:
+            raise UploadError(f"Error uploading document: {e}") from e
+    
+    def _put_blob_stream(self, stream: BinaryIO, size: int, epochs: int, deletable: bool) -> Dict[str, Any]:
+        """
+        PUT a binary stream to the publisher in STREAM_CHUNK_SIZE blocks.
+        
+        Args:
+            stream: Readable binary stream positioned at the start of the content
+            size: Number of bytes the stream will yield
+            epochs: Number of epochs the blob should be stored for
+            deletable: Whether the blob should be deletable before expiry
+            
+        Returns:
+            The raw response from the Walrus publisher
+        """
+        response = SESSION.put(
+            f"{self.publisher_url}/v1/blobs",
+            params={'epochs': epochs, 'deletable': 'true' if deletable else 'false'},
+            data=_SizedBody(_iter_hashed_chunks(stream, None, STREAM_CHUNK_SIZE), size),
+            timeout=UPLOAD_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def put_blob_from_bytes(self, data: bytes, epochs: int = 2, deletable: bool = False) -> Dict[str, Any]:
+        """
+        Upload in-memory content to Walrus storage without a temporary file.
+        
+        The bytes are PUT through the shared session; the SDK is only used if the
+        publisher does not accept the streamed PUT.
+        
+        Args:
+            data: The binary content to upload
+            epochs: Number of epochs the blob should be stored for (default: 2)
+            deletable: Whether the blob should be deletable before expiry (default: False)
+            
+        Returns:
+            The raw response from the Walrus publisher
+            
+        Raises:
+            UploadError: If the publisher rejects the upload
+        """
+        stream = io.BytesIO(data)
+        try:
+            return self._put_blob_stream(stream, len(data), epochs, deletable)
+        except requests.RequestException as e:
+            put_blob = getattr(self.client, "put_blob", None)
+            if put_blob is None or not _stream_put_unsupported(e, stream):
+                raise UploadError(f"API Error uploading document: {e}") from e
+            logger.warning("Streaming upload unavailable (%s), retrying through the SDK", e)
+        
+        try:
+            return put_blob(data, epochs=epochs, deletable=deletable)
         except Exception as e:
-            print(f"Error uploading document: {e}")
-            sys.exit(1)
+            raise UploadError(f"API Error uploading document: {e}") from e
     
     def download_document(self, blob_id: str, output_path: Union[str, Path]) -> Path:
         """
@@ -140,52 +335,100 @@ class WalrusSDKManager:
             
         Returns:
             Path to the downloaded file
+            
+        Raises:
+            DownloadError: If the blob cannot be fetched or written
         """
         output_path = Path(output_path)
         
         # If output_path is a directory, create a filename using the blob_id
-        if output_path.is_dir() or not output_path.suffix:
-            # Create directory if it doesn't exist
-            if not output_path.exists():
-                output_path.mkdir(parents=True, exist_ok=True)
-            # Use blob_id as filename if path is a directory
+        if not output_path.suffix or output_path.is_dir():
+            output_dir = output_path
             output_path = output_path / f"{blob_id}.bin"
         else:
-            # Create parent directory if it doesn't exist
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_dir = output_path.parent
+        _ensure_dir(str(output_dir))
         
-        print(f"Downloading blob {blob_id} to {output_path}...")
+        logger.info("Downloading blob %s to %s...", blob_id, output_path)
         
         try:
-            # Download blob and save to file in one step
-            self.client.get_blob_as_file(blob_id, str(output_path))
-            print(f"Document downloaded successfully to {output_path}")
+            # Stream the blob straight to disk instead of buffering it in memory
+            try:
+                self._stream_blob_to_file(blob_id, output_path)
+            except FileNotFoundError:
+                # The directory was removed after _ensure_dir cached it; recreate it and retry once
+                output_dir.mkdir(parents=True, exist_ok=True)
+                self._stream_blob_to_file(blob_id, output_path)
+            logger.info("Document downloaded successfully to %s", output_path)
             return output_path
         
-        except WalrusAPIError as e:
-            print(f"API Error downloading document: {e}")
+        except PermissionError as e:
+            logger.warning("Error writing document: %s", e)
             
             # Try alternate location as a fallback if permission error occurs
             try:
-                alt_path = Path.home() / "Documents" / f"{blob_id}.bin"
-                Path.home().joinpath("Documents").mkdir(exist_ok=True)
+                alt_dir = Path.home() / "Documents"
+                _ensure_dir(str(alt_dir))
+                alt_path = alt_dir / f"{blob_id}.bin"
                 
-                print(f"Attempting to save to {alt_path} instead...")
-                self.client.get_blob_as_file(blob_id, str(alt_path))
-                print(f"Document successfully downloaded to {alt_path}")
+                logger.info("Attempting to save to %s instead...", alt_path)
+                self._stream_blob_to_file(blob_id, alt_path)
+                logger.info("Document successfully downloaded to %s", alt_path)
                 return alt_path
             except Exception as alt_e:
-                print(f"Alternative download failed: {alt_e}")
-                sys.exit(1)
+                raise DownloadError(f"Alternative download failed: {alt_e}") from alt_e
+        
+        except DownloadError:
+            raise
+        
+        except requests.RequestException as e:
+            raise DownloadError(f"API Error downloading document: {e}") from e
                 
         except Exception as e:
-            print(f"Error downloading document: {e}")
-            sys.exit(1)
+            raise DownloadError(f"Error downloading document: {e}") from e
+    
+    def _open_blob(self, blob_id: str) -> requests.Response:
+        """GET a blob from the aggregator with a streamed body; the caller must close the response."""
+        response = SESSION.get(f"{self.aggregator_url}/v1/blobs/{blob_id}", stream=True, timeout=(5, None))
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+        response.raw.decode_content = True
+        return response
+    
+    def _stream_blob_to_file(self, blob_id: str, output_path: Path) -> None:
+        """Copy a blob from the aggregator to output_path in STREAM_CHUNK_SIZE blocks."""
+        with self._open_blob(blob_id) as response:
+            with open(output_path, "wb") as file:
+                _advise_sequential(file)
+                shutil.copyfileobj(response.raw, file, STREAM_CHUNK_SIZE)
+    
+    def iter_blob(self, blob_id: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Yield a blob's content from the aggregator as it arrives.
+        
+        Args:
+            blob_id: The blob ID of the document to read
+            chunk_size: Maximum size of each yielded chunk (default: STREAM_CHUNK_SIZE)
+            
+        Returns:
+            Iterator over the blob content
+        """
+        try:
+            with self._open_blob(blob_id) as response:
+                yield from response.iter_content(chunk_size)
+        except requests.RequestException as e:
+            raise DownloadError(f"API Error streaming blob: {e}") from e
     
     def get_blob_stream(self, blob_id: str) -> BinaryIO:
         """
         Get a document as a stream from Walrus storage.
         
+        The body is read from the aggregator on demand rather than buffered
+        up front; close the stream when done to release the connection.
+        
         Args:
             blob_id: The blob ID of the document to get
             
@@ -193,13 +436,9 @@ class WalrusSDKManager:
             Binary stream of the blob content
         """
         try:
-            return self.client.get_blob_as_stream(blob_id)
-        except WalrusAPIError as e:
-            print(f"API Error getting blob stream: {e}")
-            sys.exit(1)
-        except Exception as e:
-            print(f"Error getting blob stream: {e}")
-            sys.exit(1)
+            return self._open_blob(blob_id).raw
+        except requests.RequestException as e:
+            raise DownloadError(f"API Error getting blob stream: {e}") from e
     
     def get_metadata(self, blob_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -211,24 +450,38 @@ class WalrusSDKManager:
         Returns:
             Dictionary containing metadata, or None if not found
         """
-        print(f"Getting metadata for blob {blob_id}...")
+        with self._metadata_lock:
+            if blob_id in self._metadata_cache:
+                self._metadata_cache.move_to_end(blob_id)
+                return self._metadata_cache[blob_id]
+        
+        logger.info("Getting metadata for blob %s...", blob_id)
         
         try:
             metadata = self.client.get_blob_metadata(blob_id)
             
             if self.verbose:
-                print("API Response:")
-                print(metadata)
+                logger.info("API Response: %s", metadata)
             
+            if metadata is not None:
+                with self._metadata_lock:
+                    self._metadata_cache[blob_id] = metadata
+                    if len(self._metadata_cache) > METADATA_CACHE_SIZE:
+                        self._metadata_cache.popitem(last=False)
             return metadata
         
         except WalrusAPIError as e:
-            print(f"API Error getting metadata: {e}")
+            logger.error("API Error getting metadata: %s", e)
             return None
         except Exception as e:
-            print(f"Error getting metadata: {e}")
+            logger.error("Error getting metadata: %s", e)
             return None
     
+    def invalidate_metadata(self, blob_id: str) -> None:
+        """Drop any cached metadata for blob_id."""
+        with self._metadata_lock:
+            self._metadata_cache.pop(blob_id, None)
+    
     def delete_blob(self, blob_id: str, **kwargs: Any) -> bool:
         """
         Delete a blob from Walrus storage using SDK.
@@ -239,139 +492,196 @@ class WalrusSDKManager:
         Returns:
             True if deletion was successful, False otherwise
         """
-        print(f"Deleting blob {blob_id}...")
+        logger.info("Deleting blob %s...", blob_id)
         try:
             # The Walrus SDK likely has a delete_blob method
             response = self.client.delete_blob(blob_id)
+            self.invalidate_metadata(blob_id)
             
             if self.verbose:
-                print("API Response:")
-                print(response)
+                logger.info("API Response: %s", response)
                 
-            print(f"Document {blob_id} deleted successfully")
+            logger.info("Document %s deleted successfully", blob_id)
             return True
             
         except Exception as e:
-            print(f"Error deleting document: {e}")
+            logger.error("Error deleting document: %s", e)
             return False
     
-    def upload_document_direct(self, content: bytes, content_type: str = "application/pdf", 
-                              epochs: int = 2, deletable: bool = False) -> str:
+    def _run_bulk(self, func, items: List[Any], max_concurrency: int) -> List[Dict[str, Any]]:
+        """
+        Apply func to every item on a thread pool and collect per-item outcomes.
+        
+        Returns:
+            One {'item', 'result', 'error'} dictionary per item, in input order;
+            'error' is None when the call succeeded
+        """
+        def run(item):
+            try:
+                return {'item': item, 'result': func(item), 'error': None}
+            except Exception as e:
+                # Record the failure and keep the rest of the batch going
+                return {'item': item, 'result': None, 'error': str(e) or type(e).__name__}
+        
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as executor:
+            return list(executor.map(run, items))
+    
+    def upload_documents(self, file_paths: List[Union[str, Path]], max_concurrency: int = 10,
+                         epochs: int = 2, deletable: bool = False) -> List[Dict[str, Any]]:
+        """
+        Upload several documents concurrently.
+        
+        Args:
+            file_paths: Paths to the files to upload
+            max_concurrency: Maximum number of uploads in flight (default: 10)
+            epochs: Number of epochs the blobs should be stored for (default: 2)
+            deletable: Whether the blobs should be deletable before expiry (default: False)
+            
+        Returns:
+            Per-file results; 'result' holds the blob ID on success
+        """
+        return self._run_bulk(
+            lambda file_path: self.upload_document(file_path, epochs=epochs, deletable=deletable),
+            list(file_paths), max_concurrency
+        )
+    
+    def download_documents(self, blob_ids: List[str], output_dir: Union[str, Path],
+                           max_concurrency: int = 10) -> List[Dict[str, Any]]:
+        """
+        Download several documents concurrently into one directory.
+        
+        Args:
+            blob_ids: Blob IDs of the documents to download
+            output_dir: Directory where the documents are saved as <blob_id>.bin
+            max_concurrency: Maximum number of downloads in flight (default: 10)
+            
+        Returns:
+            Per-blob results; 'result' holds the downloaded file path on success
+        """
+        # Pass each worker an explicit file path so a suffixed directory name that does
+        # not exist yet (e.g. "out.d") is not mistaken for a single output file
+        output_dir = Path(output_dir)
+        return self._run_bulk(
+            lambda blob_id: self.download_document(blob_id, output_dir / f"{blob_id}.bin"),
+            list(blob_ids), max_concurrency
+        )
+    
+    def delete_blobs(self, blob_ids: List[str], max_concurrency: int = 10) -> List[Dict[str, Any]]:
+        """
+        Delete several blobs concurrently.
+        
+        Args:
+            blob_ids: Blob IDs to delete
+            max_concurrency: Maximum number of deletions in flight (default: 10)
+            
+        Returns:
+            Per-blob results; 'result' is True if that deletion succeeded
+        """
+        return self._run_bulk(self.delete_blob, list(blob_ids), max_concurrency)
+    
+    def upload_document_direct(self, content: Union[bytes, BinaryIO], content_type: str = "application/pdf", 
+                              epochs: int = 2, deletable: bool = False,
+                              content_length: Optional[int] = None) -> str:
         """
         Upload document content directly to Walrus using HTTP API without creating temporary files.
         
         Args:
-            content: The binary content to upload
+            content: The binary content to upload, or a readable binary stream that
+                is sent in chunks without being loaded into memory
             content_type: The MIME type of the content (default: application/pdf)
             epochs: Number of epochs the blob should be stored for (default: 2)
             deletable: Whether the blob should be deletable before expiry (default: False)
+            content_length: Size of a streamed body; when omitted it is sent chunked
             
         Returns:
             The blob ID of the uploaded document
         """
-        print("\n=== STARTING DIRECT HTTP UPLOAD ===")
-        print(f"Content type: {content_type}")
-        print(f"Content size: {len(content)} bytes")
-        print(f"Epochs: {epochs}")
-        print(f"Deletable: {deletable}")
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            content_length = len(content)
+        logger.debug("Starting direct HTTP upload: %s bytes of %s, epochs=%s, deletable=%s",
+                     content_length if content_length is not None else 'unknown',
+                     content_type, epochs, deletable)
         
-        # Calculate content hash for verification
-        hash_sha256 = hashlib.sha256(content).hexdigest()
-        print(f"Content SHA-256 hash: {hash_sha256}")
+        # The hash is only used for logging, so skip it unless debug logging is on;
+        # streamed content is hashed as it is sent
+        digest = hashlib.sha256() if logger.isEnabledFor(logging.DEBUG) else None
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            body = content
+            if digest is not None:
+                digest.update(content)
+        else:
+            body = _iter_hashed_chunks(content, digest)
+            if content_length is not None:
+                body = _SizedBody(body, content_length)
         
         # Prepare the direct upload URL
         upload_url = f"{self.publisher_url}/blob"
-        print(f"Target URL: {upload_url}")
-        
-        # Prepare parameters
         params = {
             'epochs': epochs,
             'deletable': 'true' if deletable else 'false'
         }
-        print(f"Request parameters: {params}")
-        
-        # Set content type and other headers
         headers = {
             'Content-Type': content_type,
         }
-        print(f"Request headers: {headers}")
         
-        print(f"Starting HTTP POST request to {upload_url}")
         try:
             # Make the POST request directly with the binary content
-            print(f"Sending {len(content)} bytes via POST request...")
+            logger.debug("POST %s params=%s headers=%s", upload_url, params, headers)
             request_start_time = time.time()
             
-            response = requests.post(
+            response = SESSION.post(
                 upload_url,
                 params=params,
                 headers=headers,
-                data=content
+                data=body
             )
             
-            request_duration = time.time() - request_start_time
-            print(f"POST request completed in {request_duration:.2f} seconds")
-            print(f"Response status code: {response.status_code}")
-            print(f"Response headers: {dict(response.headers)}")
+            logger.debug("POST request completed in %.2f seconds with status %s",
+                         time.time() - request_start_time, response.status_code)
+            if digest is not None:
+                logger.debug("Content SHA-256 hash: %s", digest.hexdigest())
             
             if response.status_code != 200:
-                print(f"ERROR: Upload failed with status code: {response.status_code}")
-                print(f"Response content: {response.text}")
-                raise Exception(f"Upload failed: {response.status_code} - {response.text}")
+                raise UploadError(f"Upload failed: {response.status_code} - {response.text}")
             
-            # Parse the JSON response
-            print(f"Parsing JSON response...")
             raw_response = response.json()
-            
-            if self.verbose:
-                print("Full API Response JSON:")
-                print(json.dumps(raw_response, indent=2))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Full API Response JSON: %s", json.dumps(raw_response, indent=2))
             
             # Extract blob ID from the nested response structure
-            print("Extracting blob ID from response...")
             blob_id = None
-            response_type = None
-            
             if 'alreadyCertified' in raw_response:
-                response_type = "alreadyCertified"
                 blob_id = raw_response['alreadyCertified'].get('blobId')
-                print(f"Blob was already certified with ID: {blob_id}")
+                logger.debug("Blob was already certified with ID: %s", blob_id)
             elif 'newlyCreated' in raw_response and 'blobObject' in raw_response['newlyCreated']:
-                response_type = "newlyCreated"
                 blob_object = raw_response['newlyCreated']['blobObject']
                 blob_id = blob_object.get('blobId')
-                print(f"New blob created with ID: {blob_id}")
-                print(f"Blob size: {blob_object.get('size')} bytes")
-                print(f"Creation time: {blob_object.get('creationTime')}")
+                logger.debug("New blob created with ID: %s (size %s bytes, created %s)",
+                             blob_id, blob_object.get('size'), blob_object.get('creationTime'))
             
             if not blob_id:
-                print(f"ERROR: Could not extract blob ID from response")
-                print(f"Response structure: {list(raw_response.keys())}")
-                sys.exit(1)
-            
-            print(f"SUCCESS! Document uploaded with blob ID: {blob_id}")
-            print(f"Response type: {response_type}")
-            if deletable:
-                print("Note: This blob is deletable and can be removed before expiry")
-            else:
-                print("Note: This blob is permanent and cannot be deleted before expiry")
+                raise UploadError(f"Could not extract blob ID from response with keys {list(raw_response.keys())}")
             
-            print("=== DIRECT HTTP UPLOAD COMPLETED ===\n")
-            # Return the blob ID
+            logger.debug("Document uploaded with blob ID %s (deletable=%s)", blob_id, deletable)
             return blob_id
         
-        except Exception as e:
-            print(f"ERROR DURING UPLOAD: {str(e)}")
-            print(f"Exception type: {type(e).__name__}")
-            print(f"Exception details: {str(e)}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
-            print("=== DIRECT HTTP UPLOAD FAILED ===\n")
+        except Exception:
+            logger.exception("Direct HTTP upload failed")
             raise
 
 
-def main():
-    # Parse command line arguments
+def format_json(obj: Any) -> str:
+    """Pretty-print obj as two-space indented JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser once and reuse it for every run()."""
     parser = argparse.ArgumentParser(description="Walrus SDK Document Manager")
     parser.add_argument("--context", choices=["testnet", "mainnet"], default="testnet",
                         help="Walrus context to use (default: testnet)")
@@ -400,38 +710,63 @@ def main():
     delete_parser = subparsers.add_parser("delete", help="Delete a document from Walrus")
     delete_parser.add_argument("blob_id", help="The blob ID of the document to delete")
     
-    args = parser.parse_args()
+    return parser
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Run one CLI command in-process.
+    
+    Args:
+        argv: Command line arguments without the program name (default: sys.argv[1:])
+        
+    Returns:
+        The process exit status (0 on success)
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
     
     # If no command was specified, show help
     if not args.command:
         parser.print_help()
-        sys.exit(1)
+        return 1
     
-    # Initialize the manager
-    manager = WalrusSDKManager(context=args.context, verbose=args.verbose)
+    try:
+        # Initialize the manager
+        manager = WalrusSDKManager(context=args.context, verbose=args.verbose)
     
-    # Execute the specified command
-    if args.command == "upload":
-        blob_id = manager.upload_document(
-            args.file_path, 
-            epochs=args.epochs, 
-            deletable=args.deletable
-        )
-        print(f"Blob ID: {blob_id}")
+        # Execute the specified command
+        if args.command == "upload":
+            blob_id = manager.upload_document(
+                args.file_path, 
+                epochs=args.epochs, 
+                deletable=args.deletable
+            )
+            print(f"Blob ID: {blob_id}")
         
-    elif args.command == "download":
-        output_path = manager.download_document(args.blob_id, args.output_path)
-        print(f"Document saved to: {output_path}")
+        elif args.command == "download":
+            output_path = manager.download_document(args.blob_id, args.output_path)
+            print(f"Document saved to: {output_path}")
         
-    elif args.command == "metadata":
-        metadata = manager.get_metadata(args.blob_id)
-        if metadata:
-            print("Metadata:")
-            print(json.dumps(metadata, indent=2))
-        else:
-            print(f"No metadata found for blob {args.blob_id}")
+        elif args.command == "metadata":
+            metadata = manager.get_metadata(args.blob_id)
+            if metadata:
+                print("Metadata:")
+                print(format_json(metadata))
+            else:
+                print(f"No metadata found for blob {args.blob_id}")
+    except WalrusManagerError as e:
+        print(f"Error: {e}")
+        return 1
     
+    return 0
+
+
+def main():
+    sys.exit(run())
 
 
 if __name__ == "__main__":
+    # Progress messages go to stderr so stdout carries only command results
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main() 
\ No newline at end of file
@@ -4,6 +4,16 @@ import string
 import secrets
 import random
 
+# Character sets, built once at import
+UPPERCASE = string.ascii_uppercase
+LOWERCASE = string.ascii_lowercase
+DIGITS = string.digits
+SYMBOLS = string.punctuation
+ALL_CHARS = UPPERCASE + LOWERCASE + DIGITS + SYMBOLS
+
+# One OS-backed generator shared by every call
+_SYSTEM_RANDOM = random.SystemRandom()
+
 def generate_military_grade_password(length=32):
     """
     Generates a cryptographically secure alphanumeric password:
@@ -16,29 +26,23 @@ def generate_military_grade_password(length=32):
     if length < 32:
         length = 32  # Enforce minimum length
         
-    # Define character sets
-    uppercase = string.ascii_uppercase
-    lowercase = string.ascii_lowercase
-    digits = string.digits
-    symbols = string.punctuation
-    
     # Ensure at least one of each type
     password = [
-        secrets.choice(uppercase),
-        secrets.choice(lowercase), 
-        secrets.choice(digits),
-        secrets.choice(symbols)
+        secrets.choice(UPPERCASE),
+        secrets.choice(LOWERCASE), 
+        secrets.choice(DIGITS),
+        secrets.choice(SYMBOLS)
     ]
     
     # Fill remaining length with random chars from all sets
-    all_chars = uppercase + lowercase + digits + symbols
     for _ in range(length - 4):
-        password.append(secrets.choice(all_chars))
+        password.append(secrets.choice(ALL_CHARS))
         
     # Shuffle the password characters cryptographically
-    random.SystemRandom().shuffle(password)
+    _SYSTEM_RANDOM.shuffle(password)
     
     return ''.join(password)
 
-    # Example usage:
-print(generate_military_grade_password())
+# Example usage:
+if __name__ == "__main__":
+    print(generate_military_grade_password())
@@ -19,12 +19,41 @@ import subprocess
 import argparse
 import json
 import os
+import re
+import shutil
 import sys
+import time
+from collections import deque
 from pathlib import Path
 from typing import Dict, List, Union, Optional, Any
 
+try:
+    import orjson
+    _loads_json = orjson.loads
+except ImportError:
+    orjson = None
+    _loads_json = json.loads
+
+
+def _dumps_json(obj) -> bytes:
+    """Serialize obj to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+_DELETABLE_MSG = {
+    True: "Note: This blob is deletable and can be removed before expiry.",
+    False: "Note: This blob is permanent and cannot be deleted before expiry.",
+}
+
+# Matches the "Blob ID: <id>" lines printed by walrus store
+_BLOB_ID_RE = re.compile(r"^Blob ID:\s*(\S+)", re.MULTILINE)
 
 class WalrusDocManager:
+    # (sui path, walrus path) pairs that already passed check_prerequisites in this process
+    _prereq_checked = set()
+    
     def __init__(self, capacity_id: Optional[str] = None, context: str = "testnet", verbose: bool = False):
         """
         Initialize the Walrus Document Manager.
@@ -44,14 +73,38 @@ class WalrusDocManager:
                 print(f"Using WALRUS_CAPACITY_ID from environment: {self.capacity_id[:8]}...")
         
         self.context = context
+        # Read-only CLI results keyed by (kind, ..., context) -> (timestamp, value)
+        self._cache: Dict[tuple, tuple] = {}
+        self._cache_ttl = 30.0
         self.check_prerequisites()
     
+    def _cache_get(self, key: tuple) -> Any:
+        """Return a cached value that is younger than the TTL, or None."""
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < self._cache_ttl:
+            return entry[1]
+        return None
+    
+    def _cache_set(self, key: tuple, value: Any) -> None:
+        self._cache[key] = (time.monotonic(), value)
+    
     def check_prerequisites(self) -> None:
         """Check if sui and walrus clients are installed and accessible."""
+        # `sui client balance` is an RPC call, so only run the checks once per pair of binaries
+        key = (shutil.which("sui"), shutil.which("walrus"))
+        if not all(key):
+            print(f"Error: Required client not found - {'sui' if not key[0] else 'walrus'} is not on PATH")
+            sys.exit(1)
+        # Later commands run the resolved binaries directly
+        self.sui_bin, self.walrus_bin = key
+        if key in WalrusDocManager._prereq_checked:
+            print(f"Prerequisites met! Using {self.context} context")
+            return
+        
         try:
             # Check Sui client
             sui_result = subprocess.run(
-                ["sui", "client", "balance"], 
+                [self.sui_bin, "client", "balance"], 
                 capture_output=True, 
                 text=True, 
                 check=False
@@ -68,7 +121,7 @@ class WalrusDocManager:
                 
             # Check Walrus client
             walrus_result = subprocess.run(
-                ["walrus", "--version"],
+                [self.walrus_bin, "--version"],
                 capture_output=True,
                 text=True,
                 check=False
@@ -83,6 +136,7 @@ class WalrusDocManager:
                 print(walrus_result.stderr)
                 sys.exit(1)
                 
+            WalrusDocManager._prereq_checked.add(key)
             print(f"Prerequisites met! Using {self.context} context")
         except FileNotFoundError as e:
             print(f"Error: Required client not found - {e}")
@@ -105,7 +159,7 @@ class WalrusDocManager:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        cmd = ["walrus", "store", str(file_path), "--context", self.context, "--epochs", str(epochs)]
+        cmd = [self.walrus_bin, "store", str(file_path), "--context", self.context, "--epochs", str(epochs)]
         
         # Make the blob deletable if requested
         if deletable:
@@ -120,41 +174,90 @@ class WalrusDocManager:
         if self.verbose:
             print(f"Command: {' '.join(cmd)}")
         
+        # Read the output line by line as walrus produces it instead of buffering it all;
+        # stderr is merged so neither pipe can fill up and block the child
+        blob_id = None
+        tail = deque(maxlen=50)
+        if self.verbose:
+            print("Command output:")
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as proc:
+            for line in proc.stdout:
+                if self.verbose:
+                    print(line, end="")
+                tail.append(line)
+                # Example output: "Blob ID: EOmgWhTjZb0MetbiT8wCvhxqCU9cPm8cz3dG2Pe-Czw"
+                if blob_id is None:
+                    match = _BLOB_ID_RE.match(line)
+                    if match:
+                        blob_id = match.group(1)
+        
+        if proc.returncode != 0:
+            print(f"Error uploading document:")
+            print("".join(tail))
+            sys.exit(1)
+        
+        if not blob_id:
+            print(f"Error: Could not extract blob ID from output: {''.join(tail)}")
+            sys.exit(1)
+        print(f"Document uploaded successfully! Blob ID: {blob_id}")
+        self._cache.pop(("list", self.context), None)
+        print(_DELETABLE_MSG[deletable])
+        return blob_id
+    
+    def upload_documents(self, file_paths: List[Union[str, Path]], metadata: Optional[Dict[str, str]] = None, epochs: int = 2, deletable: bool = False) -> List[str]:
+        """
+        Upload several documents to Walrus storage with a single walrus invocation.
+        
+        Args:
+            file_paths: Paths to the files to upload
+            metadata: Optional metadata to attach to every blob
+            epochs: Number of epochs the blobs should be stored for (default: 2)
+            deletable: Whether the blobs should be deletable before expiry (default: False)
+            
+        Returns:
+            The blob IDs of the uploaded documents, one per file, in the order walrus reports them
+        """
+        file_paths = [Path(file_path) for file_path in file_paths]
+        for file_path in file_paths:
+            if not file_path.exists():
+                raise FileNotFoundError(f"File not found: {file_path}")
+        
+        cmd = [self.walrus_bin, "store", *map(str, file_paths), "--context", self.context, "--epochs", str(epochs)]
+        
+        # Make the blobs deletable if requested
+        if deletable:
+            cmd.append("--deletable")
+        
+        # Add metadata if provided
+        if metadata:
+            cmd.extend(["--metadata", json.dumps(metadata)])
+        
+        print(f"Uploading {len(file_paths)} documents...")
+        if self.verbose:
+            print(f"Command: {' '.join(cmd)}")
+        
         result = subprocess.run(cmd, capture_output=True, text=True, check=False)
         
-        # Always print stdout in verbose mode
         if self.verbose:
             print("Command output:")
             print(result.stdout)
         
         if result.returncode != 0:
-            print(f"Error uploading document:")
+            print(f"Error uploading documents:")
             print(result.stderr)
             sys.exit(1)
-            
-        # Extract blob ID from output
-        output = result.stdout
-        # Example output: "Blob ID: EOmgWhTjZb0MetbiT8wCvhxqCU9cPm8cz3dG2Pe-Czw"
-        blob_id = None
-        for line in output.splitlines():
-            if line.startswith("Blob ID:"):
-                # Extract the blob ID
-                parts = line.split(":")
-                if len(parts) >= 2:
-                    blob_id = parts[1].strip()
-                    break
         
-        if not blob_id:
-            print(f"Error: Could not extract blob ID from output: {output}")
-            sys.exit(1)
-        print(f"Document uploaded successfully! Blob ID: {blob_id}")
-        if deletable:
-            print("Note: This blob is deletable and can be removed before expiry.")
-        else:
-            print("Note: This blob is permanent and cannot be deleted before expiry.")
+        # One "Blob ID: ..." line is printed per stored file
+        blob_ids = [match.group(1) for match in _BLOB_ID_RE.finditer(result.stdout)]
         
-        print(f"Entire output: {output}")
-        return blob_id
+        # Without one ID per file the IDs cannot be matched to their files
+        if len(blob_ids) != len(file_paths):
+            print(f"Error: expected {len(file_paths)} blob IDs but found {len(blob_ids)}")
+            print(result.stdout)
+            sys.exit(1)
+        print(f"Uploaded {len(blob_ids)} documents successfully")
+        self._cache.pop(("list", self.context), None)
+        return blob_ids
     
     def download_document(self, blob_id: str, output_path: Union[str, Path]) -> Path:
         """
@@ -172,27 +275,22 @@ class WalrusDocManager:
         # If output_path is a directory, create a filename using the blob_id
         if output_path.is_dir() or not output_path.suffix:
             # Create directory if it doesn't exist
-            if not output_path.exists():
-                output_path.mkdir(parents=True, exist_ok=True)
+            output_path.mkdir(parents=True, exist_ok=True)
             # Use blob_id as filename if path is a directory
             output_path = output_path / f"{blob_id}.bin"
         else:
             # Create parent directory if it doesn't exist
             output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Try to make the file writable/create it before calling walrus
-        try:
-            # Touch the file to ensure it's writable
-            with open(output_path, 'a'):
-                pass
-        except PermissionError:
+        # Check the target is writable without creating the file before walrus does
+        if not os.access(output_path.parent, os.W_OK) or (output_path.exists() and not os.access(output_path, os.W_OK)):
             print(f"Error: Cannot write to {output_path} - Permission denied")
             # Try to create file in user's home directory as fallback
             home_dir = Path.home()
             output_path = home_dir / f"{blob_id}.bin"
             print(f"Attempting to save to {output_path} instead")
         
-        cmd = ["walrus", "read"]
+        cmd = [self.walrus_bin, "read"]
         
         # Add context if specified
         if self.context:
@@ -205,11 +303,10 @@ class WalrusDocManager:
         if self.verbose:
             print(f"Command: {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        
-        if self.verbose:
-            print("Command output:")
-            print(result.stdout)
+        # The blob goes to --out, so stdout is only shown in verbose mode and never buffered;
+        # stderr is kept for the access-denied check
+        result = subprocess.run(cmd, stdout=None if self.verbose else subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, text=True, check=False)
         
         if result.returncode != 0:
             print(f"Error downloading document:")
@@ -218,16 +315,17 @@ class WalrusDocManager:
             if "Access is denied" in result.stderr:
                 print("Permission error detected. Trying to download to your Documents folder...")
                 docs_dir = Path.home() / "Documents"
-                docs_dir.mkdir(exist_ok=True)
+                docs_dir.mkdir(parents=True, exist_ok=True)
                 alt_path = docs_dir / f"{blob_id}.bin"
                 
-                cmd = ["walrus", "read"]
+                cmd = [self.walrus_bin, "read"]
                 if self.context:
                     cmd.extend(["--context", self.context])
                 cmd.extend([blob_id, "--out", str(alt_path)])
                 
                 print(f"Retrying download to {alt_path}...")
-                retry_result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+                retry_result = subprocess.run(cmd, stdout=None if self.verbose else subprocess.DEVNULL,
+                                              stderr=subprocess.PIPE, text=True, check=False)
                 
                 if retry_result.returncode == 0:
                     print(f"Document successfully downloaded to {alt_path}")
@@ -249,7 +347,11 @@ class WalrusDocManager:
         Returns:
             List of blob information dictionaries
         """
-        walrus_json_cmd = ["walrus", "json"]
+        cached = self._cache_get(("list", self.context))
+        if cached is not None:
+            return cached
+        
+        walrus_json_cmd = [self.walrus_bin, "json"]
         
         json_input = {
             "context": self.context,
@@ -258,47 +360,52 @@ class WalrusDocManager:
             }
         }
         
+        payload = _dumps_json(json_input)
+        
         print(f"Listing blobs owned by the current account...")
         if self.verbose:
             print(f"Command: {' '.join(walrus_json_cmd)}")
-            print(f"JSON Input: {json.dumps(json_input)}")
+            print(f"JSON Input: {payload.decode()}")
         
+        # Input and output stay as bytes, so neither side goes through a text round trip
         result = subprocess.run(
             walrus_json_cmd,
-            input=json.dumps(json_input),
+            input=payload,
             capture_output=True,
-            text=True,
             check=False
         )
         
         if self.verbose:
             print("Command output:")
-            print(result.stdout)
+            print(result.stdout.decode(errors="replace"))
         
         if result.returncode != 0:
             print(f"Error listing blobs:")
-            print(result.stderr)
+            print(result.stderr.decode(errors="replace"))
             return []
         
         try:
-            response = json.loads(result.stdout)
+            response = _loads_json(result.stdout)
             
             # The response is already in the expected list format
             # Just return it directly since it matches the example structure
             if isinstance(response, list):
+                self._cache_set(("list", self.context), response)
                 return response
             
             # For backwards compatibility, try to extract from result field
             if "result" in response:
-                if "listBlobs" in response["result"]:
-                    return response["result"]["listBlobs"]
-                return response["result"]
+                blobs = response["result"]
+                if "listBlobs" in blobs:
+                    blobs = blobs["listBlobs"]
+                self._cache_set(("list", self.context), blobs)
+                return blobs
                 
             print(f"Unexpected response structure: {response}")
             return []
             
         except json.JSONDecodeError:
-            print(f"Error parsing blob list output: {result.stdout}")
+            print(f"Error parsing blob list output: {result.stdout.decode(errors='replace')}")
             return []
     def delete_document(self, blob_id: str, confirm: bool = True) -> bool:
         """
@@ -311,7 +418,7 @@ class WalrusDocManager:
         Returns:
             True if deletion was successful, False otherwise
         """
-        cmd = ["walrus", "delete"]
+        cmd = [self.walrus_bin, "delete"]
         
         # Add context if specified
         if self.context:
@@ -328,11 +435,8 @@ class WalrusDocManager:
         if self.verbose:
             print(f"Command: {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        
-        if self.verbose:
-            print("Command output:")
-            print(result.stdout)
+        result = subprocess.run(cmd, stdout=None if self.verbose else subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, text=True, check=False)
         
         if result.returncode != 0:
             print(f"Error deleting document:")
@@ -340,6 +444,8 @@ class WalrusDocManager:
             return False
             
         print(f"Document {blob_id} deleted successfully")
+        self._cache.pop(("list", self.context), None)
+        self._cache.pop(("meta", blob_id, self.context), None)
         return True
     
     def get_metadata(self, blob_id: str) -> Optional[Dict[str, Any]]:
@@ -352,7 +458,11 @@ class WalrusDocManager:
         Returns:
             Dictionary containing metadata, or None if not found
         """
-        cmd = ["walrus", "metadata"]
+        cached = self._cache_get(("meta", blob_id, self.context))
+        if cached is not None:
+            return cached
+        
+        cmd = [self.walrus_bin, "metadata"]
         
         # Add context if specified
         if self.context:
@@ -365,29 +475,148 @@ class WalrusDocManager:
         if self.verbose:
             print(f"Command: {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        result = subprocess.run(cmd, capture_output=True, check=False)
         
         if self.verbose:
             print("Command output:")
-            print(result.stdout)
+            print(result.stdout.decode(errors="replace"))
         
         if result.returncode != 0:
             print(f"Error getting metadata:")
-            print(result.stderr)
+            print(result.stderr.decode(errors="replace"))
             return None
             
         try:
-            metadata = json.loads(result.stdout)
+            metadata = _loads_json(result.stdout)
+            self._cache_set(("meta", blob_id, self.context), metadata)
             return metadata
         except json.JSONDecodeError:
-            print(f"Error parsing metadata output: {result.stdout}")
+            print(f"Error parsing metadata output: {result.stdout.decode(errors='replace')}")
             return None
 
 
-def main():
-    # Fixed file path
-    file_path = r"C:\Users\tobya\OneDrive\Desktop\R21M_Nigeria\Epoch_One\archpoint.pdf"
+# Fixed file path
+FILE_PATH = r"C:\Users\tobya\OneDrive\Desktop\R21M_Nigeria\Epoch_One\archpoint.pdf"
+
+MENU = """
+Available commands:
+1. upload - Upload the document
+2. download - Download a document
+3. list - List documents
+4. delete - Delete a document
+5. metadata - Get document metadata
+6. exit - Exit program"""
+
+
+def _do_upload(manager: WalrusDocManager) -> None:
+    # Get epochs for storage duration
+    epochs = 2  # Default value
+    try:
+        epochs_input = input("Enter number of epochs to store the document (default: 2): ").strip()
+        if epochs_input:
+            epochs = int(epochs_input)
+    except ValueError:
+        print("Invalid number of epochs. Using default value of 2.")
+        epochs = 2
+        
+    # Ask if the blob should be deletable
+    deletable = input("Make the blob deletable? (y/n): ").lower() == 'y'
     
+    # Simple metadata entry system
+    print("\nMetadata Entry (press Enter after each value, or leave blank to skip)")
+    metadata = {}
+    
+    # Always prompt for common metadata fields
+    title = input("Document title: ").strip()
+    if title:
+        metadata["title"] = title
+        
+    description = input("Description: ").strip()
+    if description:
+        metadata["description"] = description
+        
+    doc_type = input("Document type (e.g., PDF, report, letter): ").strip()
+    if doc_type:
+        metadata["type"] = doc_type
+    
+    # Ask if user wants to add more custom fields
+    while True:
+        custom_key = input("\nAdd another metadata field? (Enter field name or leave blank to finish): ").strip()
+        if not custom_key:
+            break
+            
+        custom_value = input(f"Enter value for '{custom_key}': ").strip()
+        metadata[custom_key] = custom_value
+    
+    # Show the final metadata object that will be used
+    if metadata:
+        print("\nFinal metadata that will be uploaded:")
+        print(json.dumps(metadata, indent=2))
+        if input("Proceed with this metadata? (y/n): ").lower() != 'y':
+            return
+    else:
+        print("No metadata will be attached to the document")
+        metadata = None
+    
+    blob_id = manager.upload_document(FILE_PATH, metadata, epochs, deletable)
+    print(f"Blob ID: {blob_id}")
+
+
+def _do_download(manager: WalrusDocManager) -> None:
+    blob_id = input("Enter blob ID to download: ")
+    output_path = input("Enter output path: ")
+    output_path = manager.download_document(blob_id, output_path)
+    print(f"Document saved to: {output_path}")
+
+
+def _do_list(manager: WalrusDocManager) -> None:
+    blobs = manager.list_blobs()
+    
+    if blobs:
+        # Build the whole listing first and write it in one go
+        lines = [f"Found {len(blobs)} blobs:"]
+        for i, blob in enumerate(blobs, 1):
+            lines.append(f"{i}. Blob ID: {blob.get('id')}")
+            if 'size' in blob:
+                lines.append(f"   Size: {blob['size']} bytes")
+            if 'created_at' in blob:
+                lines.append(f"   Created: {blob['created_at']}")
+            lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
+    else:
+        print("No blobs found for your account")
+
+
+def _do_delete(manager: WalrusDocManager) -> None:
+    blob_id = input("Enter blob ID to delete: ")
+    confirm = input("Skip confirmation prompt? (y/n): ").lower() != 'y'
+    success = manager.delete_document(blob_id, confirm)
+    if success:
+        print(f"Document {blob_id} deleted successfully")
+    else:
+        print(f"Failed to delete document {blob_id}")
+
+
+def _do_metadata(manager: WalrusDocManager) -> None:
+    blob_id = input("Enter blob ID to get metadata: ")
+    metadata = manager.get_metadata(blob_id)
+    if metadata:
+        print("Metadata:")
+        print(json.dumps(metadata, indent=2))
+    else:
+        print(f"No metadata found for blob {blob_id}")
+
+
+HANDLERS = {
+    "1": _do_upload,
+    "2": _do_download,
+    "3": _do_list,
+    "4": _do_delete,
+    "5": _do_metadata,
+}
+
+
+def main():
     # Get context via input
     while True:
         context = input("Enter context (testnet/mainnet): ").lower()
@@ -406,112 +635,16 @@ def main():
     
     # Get command via input
     while True:
-        print("\nAvailable commands:")
-        print("1. upload - Upload the document")
-        print("2. download - Download a document")
-        print("3. list - List documents")
-        print("4. delete - Delete a document")
-        print("5. metadata - Get document metadata")
-        print("6. exit - Exit program")
-        
+        print(MENU)
         command = input("\nEnter command number: ").strip()
         
-        if command == "1":
-            # Get epochs for storage duration
-            epochs = 2  # Default value
-            try:
-                epochs_input = input("Enter number of epochs to store the document (default: 2): ").strip()
-                if epochs_input:
-                    epochs = int(epochs_input)
-            except ValueError:
-                print("Invalid number of epochs. Using default value of 2.")
-                epochs = 2
-                
-            # Ask if the blob should be deletable
-            deletable = input("Make the blob deletable? (y/n): ").lower() == 'y'
-            
-            # Simple metadata entry system
-            print("\nMetadata Entry (press Enter after each value, or leave blank to skip)")
-            metadata = {}
-            
-            # Always prompt for common metadata fields
-            title = input("Document title: ").strip()
-            if title:
-                metadata["title"] = title
-                
-            description = input("Description: ").strip()
-            if description:
-                metadata["description"] = description
-                
-            doc_type = input("Document type (e.g., PDF, report, letter): ").strip()
-            if doc_type:
-                metadata["type"] = doc_type
-            
-            # Ask if user wants to add more custom fields
-            while True:
-                custom_key = input("\nAdd another metadata field? (Enter field name or leave blank to finish): ").strip()
-                if not custom_key:
-                    break
-                    
-                custom_value = input(f"Enter value for '{custom_key}': ").strip()
-                metadata[custom_key] = custom_value
-            
-            # Show the final metadata object that will be used
-            if metadata:
-                print("\nFinal metadata that will be uploaded:")
-                print(json.dumps(metadata, indent=2))
-                if input("Proceed with this metadata? (y/n): ").lower() != 'y':
-                    continue
-            else:
-                print("No metadata will be attached to the document")
-                metadata = None
-            
-            blob_id = manager.upload_document(file_path, metadata, epochs, deletable)
-            print(f"Blob ID: {blob_id}")
-            
-        elif command == "2":
-            blob_id = input("Enter blob ID to download: ")
-            output_path = input("Enter output path: ")
-            output_path = manager.download_document(blob_id, output_path)
-            print(f"Document saved to: {output_path}")
-            
-        elif command == "3":
-            blobs = manager.list_blobs()
-            
-            if blobs:
-                print(f"Found {len(blobs)} blobs:")
-                for i, blob in enumerate(blobs, 1):
-                    print(f"{i}. Blob ID: {blob.get('id')}")
-                    if 'size' in blob:
-                        print(f"   Size: {blob['size']} bytes")
-                    if 'created_at' in blob:
-                        print(f"   Created: {blob['created_at']}")
-                    print()
-            else:
-                print("No blobs found for your account")
-                
-        elif command == "4":
-            blob_id = input("Enter blob ID to delete: ")
-            confirm = input("Skip confirmation prompt? (y/n): ").lower() != 'y'
-            success = manager.delete_document(blob_id, confirm)
-            if success:
-                print(f"Document {blob_id} deleted successfully")
-            else:
-                print(f"Failed to delete document {blob_id}")
-                
-        elif command == "5":
-            blob_id = input("Enter blob ID to get metadata: ")
-            metadata = manager.get_metadata(blob_id)
-            if metadata:
-                print("Metadata:")
-                print(json.dumps(metadata, indent=2))
-            else:
-                print(f"No metadata found for blob {blob_id}")
-                
-        elif command == "6":
+        if command == "6":
             break
-        else:
+        command_handler = HANDLERS.get(command)
+        if command_handler is None:
             print("Invalid command number")
+        else:
+            command_handler(manager)
 
 
 if __name__ == "__main__":